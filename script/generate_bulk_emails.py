@@ -3,15 +3,24 @@
 
 import os
 import sys
+import errno
+import mmap
+import base64
+import struct
+import zlib
 import random
 import argparse
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
-from email.mime.image import MIMEImage
+from collections import namedtuple
+from functools import partial
+from multiprocessing import Pool
 from datetime import datetime, timedelta
 from io import BytesIO
 
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
 PERSONAS = [
     {'name': 'Ada Lovelace', 'email': 'ada.lovelace@analyticalengine.co.uk'},
     {'name': 'Charles Babbage', 'email': 'charles.babbage@differencemachine.co.uk'},
@@ -25,6 +34,12 @@ PERSONAS = [
     {'name': 'Bjarne Stroustrup', 'email': 'bjarne@cpp.org'},
 ]
 
+# Header strings derived from each persona, built once instead of per email
+for persona in PERSONAS:
+    persona['header'] = f"{persona['name']} <{persona['email']}>"
+    persona['first'] = persona['name'].split()[0]
+    persona['domain'] = persona['email'].split('@')[1]
+
 SUBJECTS = [
     'Re: Code Review Request',
     'Meeting Notes from {date}',
@@ -43,8 +58,77 @@ SUBJECTS = [
     'Release notes v{version}',
 ]
 
+URING_BATCH_SIZE = 64
+URING_SLOT_SIZE = 64 * 1024
+DIRECT_IO_ALIGNMENT = 4096
+_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+_O_DIRECT = getattr(os, 'O_DIRECT', 0)
+
+PDF_POOL_SIZE = 8
+IMAGE_COLORS = {'red': (255, 0, 0), 'blue': (0, 0, 255), 'green': (0, 128, 0)}
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Base64-encoded attachment payloads, rendered once in main() and shared with the workers
+PDF_POOL = []
+IMG_POOL = {}
+
+SUBJECT_PLACEHOLDERS = ('date', 'num', 'feature', 'version')
+
+
+def _subject_fn(template):
+    """Specialize a subject template into a function of (date, num, feature, version)."""
+    for position, field in enumerate(SUBJECT_PLACEHOLDERS):
+        if f'{{{field}}}' in template:
+            prefix, suffix = template.split(f'{{{field}}}')
+            return lambda *values: f'{prefix}{values[position]}{suffix}'
+    return lambda *values: template
+
+
+SUBJECT_FNS = [_subject_fn(subject) for subject in SUBJECTS]
+
 FEATURES = ['dark mode', 'export function', 'user dashboard', 'API v2', 'authentication']
 
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; padding: 20px;">
+<p>%s</p>
+</body>
+</html>"""
+
+# Serialized layout of a message, matching what the email package emits
+# for a multipart/mixed message with a text part and optional attachments
+EML_TEMPLATE = """Content-Type: multipart/mixed; boundary="%(boundary)s"
+MIME-Version: 1.0
+Subject: %(subject)s
+From: %(from)s
+To: %(to)s
+Date: %(date)s
+Message-ID: %(msgid)s
+
+--%(boundary)s
+Content-Type: text/%(subtype)s; charset="us-ascii"
+MIME-Version: 1.0
+Content-Transfer-Encoding: 7bit
+
+%(body)s
+%(attachments)s--%(boundary)s--
+"""
+
+ATTACHMENT_TEMPLATE = """--%(boundary)s
+Content-Type: %(content_type)s
+MIME-Version: 1.0
+Content-Transfer-Encoding: base64
+Content-Disposition: attachment; filename="%(filename)s"
+
+%(payload)s
+"""
+
+# Random choices for one email, drawn up front for the whole batch
+EmailDraw = namedtuple('EmailDraw', [
+    'index', 'sender', 'recipient', 'subject',
+    'body', 'days', 'hours', 'minutes', 'msg_id', 'html', 'attach', 'pdf', 'image', 'color',
+])
+
 BODY_TEMPLATES = [
     "Hi {recipient},\n\nI wanted to follow up on our previous discussion.\n\nBest,\n{sender}",
     "Dear {recipient},\n\nPlease find the attached document.\n\nRegards,\n{sender}",
@@ -54,16 +138,217 @@ BODY_TEMPLATES = [
 ]
 
 
+class UringBatchWriter:
+    """Write files in batches, one io_uring submission per batch.
+
+    Messages that fit an arena slot are written with O_DIRECT from the
+    page-aligned arena, padded to the block size and truncated back after
+    the write. Falls back to plain POSIX writes when liburing is not
+    installed or the ring cannot be set up, and to buffered I/O when the
+    filesystem rejects O_DIRECT.
+    """
+
+    def __init__(self, batch_size=URING_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.pending = []
+        self.arena = mmap.mmap(-1, batch_size * URING_SLOT_SIZE)
+        view = memoryview(self.arena)
+        self.slots = [view[k * URING_SLOT_SIZE:(k + 1) * URING_SLOT_SIZE]
+                      for k in range(batch_size)]
+        self.direct = bool(_O_DIRECT)
+        self.fixed = False
+        self.ring = None
+        if liburing is not None:
+            ring = liburing.Ring()
+            try:
+                liburing.io_uring_queue_init(batch_size, ring)
+            except OSError:
+                # io_uring blocked by seccomp or disabled via sysctl
+                return
+            self.ring = ring
+            self.cqe = liburing.Cqe()
+            self._register(batch_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            # Don't retry queued writes while an error is propagating
+            self.pending = []
+        self.close()
+
+    def write(self, path, data):
+        """Queue data to be written to path, flushing once the batch is full."""
+        self.pending.append((path, data))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write out all queued files."""
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        if self.ring is None:
+            self._write_posix(batch)
+        else:
+            self._submit(batch)
+
+    def close(self):
+        self.flush()
+        if self.ring is not None:
+            if self.fixed:
+                liburing.io_uring_unregister_files(self.ring)
+                liburing.io_uring_unregister_buffers(self.ring)
+            liburing.io_uring_queue_exit(self.ring)
+            self.ring = None
+
+    def _register(self, batch_size):
+        """Pin the arena slots and one file table entry per batch position."""
+        probe = liburing.io_uring_get_probe_ring(self.ring)
+        try:
+            supported = liburing.io_uring_opcode_supported(
+                probe, liburing.io_uring_op.IORING_OP_WRITEV_FIXED)
+        finally:
+            liburing.io_uring_free_probe(probe)
+        if not supported:
+            return
+
+        self.iovecs = liburing.Iovec(self.slots)
+        try:
+            liburing.io_uring_register_buffers(self.ring, self.iovecs)
+        except OSError:
+            # e.g. RLIMIT_MEMLOCK before 5.12; plain writes still work
+            return
+        self.files = liburing.FileIndex([-1] * batch_size)
+        try:
+            liburing.io_uring_register_files(self.ring, self.files)
+        except OSError:
+            liburing.io_uring_unregister_buffers(self.ring)
+            return
+        self.fixed = True
+
+    def _open_direct(self, path):
+        """Open path with O_DIRECT, or return None if the filesystem rejects it."""
+        try:
+            return os.open(path, _OPEN_FLAGS | _O_DIRECT, 0o644)
+        except OSError as e:
+            if e.errno != errno.EINVAL:
+                raise
+            # e.g. tmpfs; stay on buffered I/O for the rest of the run
+            self.direct = False
+            return None
+
+    def _stage(self, idx, data, direct):
+        """Copy data into its arena slot and return the view to write."""
+        slot = self.slots[idx]
+        slot[:len(data)] = data
+        if direct:
+            padded = -(-len(data) // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT
+            # Newlines rather than a previous message's leftovers, so the file
+            # is still a valid EML if the truncate never happens
+            slot[len(data):padded] = b'\n' * (padded - len(data))
+            return slot[:padded]
+        return slot[:len(data)]
+
+    def _write_posix(self, batch):
+        for path, data in batch:
+            fd = None
+            if self.direct and len(data) <= URING_SLOT_SIZE:
+                fd = self._open_direct(path)
+            if fd is None:
+                with open(path, 'wb') as f:
+                    f.write(data)
+                continue
+
+            try:
+                staged = self._stage(0, data, direct=True)
+                written = os.pwrite(fd, staged, 0)
+                if written != len(staged):
+                    raise OSError(f"Short write to {path}: {written}/{len(staged)} bytes")
+                os.ftruncate(fd, len(data))
+            finally:
+                os.close(fd)
+
+    def _submit(self, batch):
+        fds = []
+        direct = []
+        parts = []
+        try:
+            for path, data in batch:
+                fd = None
+                if self.fixed and self.direct and len(data) <= URING_SLOT_SIZE:
+                    fd = self._open_direct(path)
+                direct.append(fd is not None)
+                fds.append(fd if fd is not None else os.open(path, _OPEN_FLAGS, 0o644))
+            if self.fixed:
+                liburing.io_uring_register_files_update(self.ring, liburing.FileIndex(fds), 0)
+
+            sizes = []
+            for idx, (path, data) in enumerate(batch):
+                sqe = liburing.io_uring_get_sqe(self.ring)
+                if self.fixed and len(data) <= URING_SLOT_SIZE:
+                    # Batch position doubles as registered file and buffer index
+                    staged = self._stage(idx, data, direct[idx])
+                    part = liburing.Iovec([staged])
+                    parts.append(part)
+                    sizes.append(len(staged))
+                    liburing.io_uring_prep_writev_fixed(sqe, idx, part, idx, 0)
+                    liburing.io_uring_sqe_set_flags(sqe, liburing.IOSQE_FIXED_FILE)
+                else:
+                    # The kernel reads from buf after submit, so keep it alive
+                    buf = bytes(data)
+                    parts.append(buf)
+                    sizes.append(len(buf))
+                    liburing.io_uring_prep_write(sqe, fds[idx], buf, 0)
+                liburing.io_uring_sqe_set_data64(sqe, idx)
+            liburing.io_uring_submit(self.ring)
+
+            # Reap every completion before raising, so no write is still in
+            # flight on a closed fd and no stale CQE is left for the next batch
+            error = None
+            for _ in batch:
+                liburing.io_uring_wait_cqe(self.ring, self.cqe)
+                cqe = self.cqe[0]
+                idx, res = cqe.user_data, cqe.res
+                liburing.io_uring_cqe_seen(self.ring, cqe)
+                path, data = batch[idx]
+                try:
+                    if res < 0:
+                        raise OSError(-res, os.strerror(-res), path)
+                    if res != sizes[idx]:
+                        raise OSError(f"Short write to {path}: {res}/{sizes[idx]} bytes")
+                    if direct[idx]:
+                        # Drop the block padding written from the arena slot
+                        os.ftruncate(fds[idx], len(data))
+                except OSError as e:
+                    if error is None:
+                        error = e
+            if error is not None:
+                raise error
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
 def create_sample_image(width=100, height=100, color='blue'):
     """Create a simple colored rectangle as PNG"""
-    try:
-        from PIL import Image, ImageDraw
-        img = Image.new('RGB', (width, height), color='white')
-        draw = ImageDraw.Draw(img)
-        draw.rectangle([10, 10, width-10, height-10], fill=color)
-        return img
-    except ImportError:
-        return None
+    # White canvas with a filled rectangle inset by 10px, one scanline per row
+    white = b'\xff\xff\xff'
+    fill = bytes(IMAGE_COLORS[color])
+    border_row = b'\x00' + white * width
+    rect_row = b'\x00' + white * 10 + fill * (width - 19) + white * 9
+    rows = [rect_row if 10 <= y <= height - 10 else border_row for y in range(height)]
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (PNG_SIGNATURE
+            + _png_chunk(b'IHDR', header)
+            + _png_chunk(b'IDAT', zlib.compress(b''.join(rows)))
+            + _png_chunk(b'IEND', b''))
 
 
 def create_sample_pdf(title="Document"):
@@ -80,72 +365,117 @@ def create_sample_pdf(title="Document"):
         return None
 
 
-def generate_subject():
-    """Generate a random subject line."""
-    template = random.choice(SUBJECTS)
-    return template.format(
-        date=(datetime.now() - timedelta(days=random.randint(0, 30))).strftime('%Y-%m-%d'),
-        num=random.randint(100, 9999),
-        feature=random.choice(FEATURES),
-        version=f"{random.randint(1,5)}.{random.randint(0,9)}.{random.randint(0,9)}"
-    )
+def build_attachment_pools():
+    """Render and base64-encode the reusable PDF and PNG attachment payloads."""
+    pdf_pool = [create_sample_pdf(f"Document_template_{k}") for k in range(PDF_POOL_SIZE)]
+    img_pool = {color: create_sample_image(100, 100, color) for color in IMAGE_COLORS}
+    # encodebytes wraps at 76 characters per line, like the email package
+    return ([base64.encodebytes(pdf).decode('ascii') for pdf in pdf_pool if pdf],
+            {color: base64.encodebytes(img).decode('ascii') for color, img in img_pool.items()})
+
+
+def _init_worker(pdf_pool, img_pool):
+    global PDF_POOL, IMG_POOL
+    PDF_POOL, IMG_POOL = pdf_pool, img_pool
 
 
-def generate_email(index, add_attachments=True):
-    """Generate a single mock email."""
-    sender = random.choice(PERSONAS)
-    recipient = random.choice([p for p in PERSONAS if p != sender])
-
-    msg = MIMEMultipart()
-    msg['Subject'] = generate_subject()
-    msg['From'] = f"{sender['name']} <{sender['email']}>"
-    msg['To'] = f"{recipient['name']} <{recipient['email']}>"
-    msg['Date'] = (datetime.now() - timedelta(
-        days=random.randint(0, 365),
-        hours=random.randint(0, 23),
-        minutes=random.randint(0, 59)
-    )).strftime('%a, %d %b %Y %H:%M:%S +0000')
-    msg['Message-ID'] = f"<{random.randint(1000000, 9999999)}.{index}@{sender['email'].split('@')[1]}>"
-
-    # Body
-    body_template = random.choice(BODY_TEMPLATES)
-    body = body_template.format(
-        sender=sender['name'].split()[0],
-        recipient=recipient['name'].split()[0]
+def draw_emails(count, now, rng=random):
+    """Draw the random choices for a batch of emails in one pass per field."""
+    def ints(low, high):
+        return rng.choices(range(low, high + 1), k=count)
+
+    def chances(threshold):
+        return [rng.random() > threshold for _ in range(count)]
+
+    senders = ints(0, len(PERSONAS) - 1)
+    # Offset from the sender so the recipient is always someone else
+    recipients = [(s + 1 + offset) % len(PERSONAS)
+                  for s, offset in zip(senders, ints(0, len(PERSONAS) - 2))]
+
+    # Subjects are built for the whole batch from their specialized templates
+    dates = [(now - timedelta(days=days)).strftime('%Y-%m-%d') for days in range(31)]
+    versions = [f"{a}.{b}.{c}" for a, b, c in zip(ints(1, 5), ints(0, 9), ints(0, 9))]
+    subjects = [SUBJECT_FNS[template](date, num, feature, version)
+                for template, date, num, feature, version in zip(
+                    ints(0, len(SUBJECTS) - 1), rng.choices(dates, k=count),
+                    ints(100, 9999), rng.choices(FEATURES, k=count), versions)]
+
+    return [EmailDraw(*fields) for fields in zip(
+        range(1, count + 1), senders, recipients, subjects,
+        ints(0, len(BODY_TEMPLATES) - 1), ints(0, 365), ints(0, 23), ints(0, 59),
+        ints(1000000, 9999999), chances(0.5), chances(0.7),
+        ints(0, PDF_POOL_SIZE - 1), chances(0.5), rng.choices(list(IMAGE_COLORS), k=count),
+    )]
+
+
+def generate_headers(draw, now):
+    """Generate the header values of a single mock email."""
+    sender = PERSONAS[draw.sender]
+    return {
+        'subject': draw.subject,
+        'from': sender['header'],
+        'to': PERSONAS[draw.recipient]['header'],
+        'date': (now - timedelta(
+            days=draw.days,
+            hours=draw.hours,
+            minutes=draw.minutes
+        )).strftime('%a, %d %b %Y %H:%M:%S +0000'),
+        'msgid': f"<{draw.msg_id}.{draw.index}@{sender['domain']}>",
+    }
+
+
+def generate_body(draw):
+    """Generate the text subtype and content of a single mock email body."""
+    body = BODY_TEMPLATES[draw.body].format(
+        sender=PERSONAS[draw.sender]['first'],
+        recipient=PERSONAS[draw.recipient]['first']
     )
 
     # Randomly choose plain text or HTML
-    if random.random() > 0.5:
-        html_body = f"""<!DOCTYPE html>
-<html>
-<body style="font-family: Arial, sans-serif; padding: 20px;">
-<p>{body.replace(chr(10), '<br>')}</p>
-</body>
-</html>"""
-        msg.attach(MIMEText(html_body, 'html'))
-    else:
-        msg.attach(MIMEText(body, 'plain'))
+    if draw.html:
+        return 'html', HTML_TEMPLATE % body.replace('\n', '<br>')
+    return 'plain', body
 
-    # Randomly add attachments
-    if add_attachments and random.random() > 0.7:
+
+def generate_email(draw, now, add_attachments=True):
+    """Serialize a single mock email from its pre-drawn random choices."""
+    index = draw.index
+    fields = generate_headers(draw, now)
+    fields['subtype'], fields['body'] = generate_body(draw)
+    # Same shape as the email package's boundaries: 15 '=', 19 digits, '=='
+    fields['boundary'] = f"{'=' * 15}{draw.msg_id:07d}{index:012d}=="
+
+    # Randomly add attachments, splicing in the pre-encoded payloads
+    attachments = []
+    if add_attachments and draw.attach:
         # Try to add PDF
-        pdf_data = create_sample_pdf(f"Document_{index}")
-        if pdf_data:
-            pdf_att = MIMEApplication(pdf_data, _subtype='pdf')
-            pdf_att.add_header('Content-Disposition', 'attachment', filename=f'document_{index}.pdf')
-            msg.attach(pdf_att)
+        if PDF_POOL:
+            attachments.append(ATTACHMENT_TEMPLATE % {
+                'boundary': fields['boundary'],
+                'content_type': 'application/pdf',
+                'filename': f'document_{index}.pdf',
+                'payload': PDF_POOL[draw.pdf % len(PDF_POOL)],
+            })
 
         # Try to add image
-        if random.random() > 0.5:
-            img = create_sample_image(100, 100, random.choice(['red', 'blue', 'green']))
-            if img:
-                img_buffer = BytesIO()
-                img.save(img_buffer, format='PNG')
-                img_att = MIMEImage(img_buffer.getvalue(), _subtype='png')
-                img_att.add_header('Content-Disposition', 'attachment', filename=f'image_{index}.png')
-                msg.attach(img_att)
+        if draw.image:
+            img_data = IMG_POOL.get(draw.color)
+            if img_data:
+                attachments.append(ATTACHMENT_TEMPLATE % {
+                    'boundary': fields['boundary'],
+                    'content_type': 'image/png',
+                    'filename': f'image_{index}.png',
+                    'payload': img_data,
+                })
+    fields['attachments'] = ''.join(attachments)
+
+    return (EML_TEMPLATE % fields).encode('ascii')
+
 
-    return msg
+def render_email(draw, now, output, add_attachments=True):
+    """Generate a single mock email and return its target path and EML bytes."""
+    eml_path = os.path.join(output, f'bulk_email_{draw.index:04d}.eml')
+    return eml_path, generate_email(draw, now, add_attachments=add_attachments)
 
 
 def main():
@@ -163,16 +493,21 @@ def main():
 
     print(f"Generating {args.count} mock email(s) in {args.output}...")
 
-    for i in range(1, args.count + 1):
-        msg = generate_email(i, add_attachments=not args.no_attachments)
+    pools = ([], {}) if args.no_attachments else build_attachment_pools()
 
-        # Write EML file
-        eml_path = os.path.join(args.output, f'bulk_email_{i:04d}.eml')
-        with open(eml_path, 'w') as f:
-            f.write(msg.as_string())
+    # Workers only build and serialize emails; this process owns all the writes
+    now = datetime.now()
+    # Report about 50 times per run, however large the batch
+    report_every = max(10, args.count // 50)
+    render = partial(render_email, now=now, output=args.output,
+                     add_attachments=not args.no_attachments)
+    with Pool(initializer=_init_worker, initargs=pools) as pool, UringBatchWriter() as writer:
+        emails = pool.imap_unordered(render, draw_emails(args.count, now), chunksize=64)
+        for done, (eml_path, data) in enumerate(emails, 1):
+            writer.write(eml_path, data)
 
-        if (i % 10 == 0) or i == args.count:
-            print(f"  Generated {i}/{args.count} emails...")
+            if (done % report_every == 0) or done == args.count:
+                print(f"  Generated {done}/{args.count} emails...")
 
     print(f"Done! Generated {args.count} email(s) in {args.output}")
 
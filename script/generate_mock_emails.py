@@ -2,13 +2,21 @@
 import os
 import base64
 from io import BytesIO
+from email.charset import Charset
+from email.generator import BytesGenerator
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from email.mime.image import MIMEImage
+from email.mime.nonmultipart import MIMENonMultipart
 from email.mime.message import MIMEMessage
 from email.mime.application import MIMEApplication
 from datetime import datetime, timedelta
 import random
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from string import Template
+
+from PIL import Image, ImageDraw
+from reportlab.pdfgen import canvas
 
 PERSONAS = [
     {
@@ -55,44 +63,70 @@ PERSONAS = [
     }
 ]
 
-def format_currency(amount):
-    return f"£{amount:,.2f}"
-
-def create_invoice_html(from_persona, to_persona):
-    invoice_number = f"INV-{random.randint(1000, 9999)}"
-    items = [
-        {
-            'description': 'Analytical Engine Consultation',
-            'quantity': 5,
-            'rate': 150.0,
-            'amount': 750.0
-        },
-        {
-            'description': 'Algorithm Development',
-            'quantity': 3,
-            'rate': 200.0,
-            'amount': 600.0
-        },
-        {
-            'description': 'Punch Card Programming',
-            'quantity': 10,
-            'rate': 75.0,
-            'amount': 750.0
-        }
-    ]
-    total = sum(item['amount'] for item in items)
-    
-    items_html = ""
-    for item in items:
-        items_html += f"""
-            <tr>
-                <td style="padding: 10px; border-top: 1px solid #ddd;">{item['description']}</td>
-                <td style="padding: 10px; border-top: 1px solid #ddd; text-align: right;">{item['quantity']}</td>
-                <td style="padding: 10px; border-top: 1px solid #ddd; text-align: right;">{format_currency(item['rate'])}</td>
-                <td style="padding: 10px; border-top: 1px solid #ddd; text-align: right;">{format_currency(item['amount'])}</td>
-            </tr>"""
-
-    return f"""<!DOCTYPE html>
+# From/To address and Message-ID domain for each persona
+for persona in PERSONAS:
+    persona['header'] = f"{persona['name']} <{persona['email']}>"
+    persona['domain'] = persona['email'].split('@')[1]
+
+OUTPUT_DIR = 'doc/eml/'
+
+_RFC2822_FMT = '%a, %d %b %Y %H:%M:%S +0000'
+
+# Charsets shared by every HTML part instead of being rebuilt per MIMEText
+_ASCII = Charset('us-ascii')
+_UTF8 = Charset('utf-8')
+
+BASIC_TMPL = Template("""<!DOCTYPE html><html><body style="font-family: Arial; padding: 20px;">
+                $header<p>Dear $to_name,</p>$intro
+                <img src="cid:company-logo" style="max-width: 200px;"></body></html>""")
+
+# Email type -> (heading HTML, intro HTML, PDF attachment title)
+SCENARIO_META = {
+    'invoice': ('', '', 'Invoice Details'),
+    'update': ('', '<p>Significant progress on universal computing.</p>', 'Project Specifications'),
+    'bug_report': ('', '<p>Found a bug in the compiler.</p>', 'Debug Logs'),
+    'minutes': ('<h2>Meeting Summary</h2>', '', 'Meeting Minutes')
+}
+
+# Serialized layout of the basic emails, matching what the email package
+# emits for a multipart/mixed message with an HTML part and attachments
+BASIC_EML_TMPL = Template("""Content-Type: multipart/mixed; boundary="$boundary"
+MIME-Version: 1.0
+Subject: $subject
+From: $sender
+To: $recipient
+Date: $date
+Message-ID: $message_id
+
+--$boundary
+Content-Type: text/html; charset="$charset"
+MIME-Version: 1.0
+Content-Transfer-Encoding: $encoding
+
+$html
+$parts--$boundary--
+""")
+
+LOGO_PART_TMPL = Template("""--$boundary
+Content-Type: image/svg+xml
+MIME-Version: 1.0
+Content-Transfer-Encoding: base64
+Content-ID: <company-logo>
+Content-Disposition: inline; filename="company_logo.svg"
+
+$payload
+""")
+
+PDF_PART_TMPL = Template("""--$boundary
+Content-Type: application/pdf
+MIME-Version: 1.0
+Content-Transfer-Encoding: base64
+Content-Disposition: attachment; filename="$filename"
+
+$payload
+""")
+
+INVOICE_TMPL = Template("""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -100,17 +134,17 @@ def create_invoice_html(from_persona, to_persona):
 <body style="font-family: Arial, sans-serif; line-height: 1.6; max-width: 800px; margin: 0 auto; padding: 20px;">
     <img src="cid:company-logo" style="max-width: 400px;"><br>
     <div style="text-align: right;">
-        <h2>{from_persona['company']}</h2>
-        <p>Invoice #{invoice_number}</p>
-        <p>Date: {datetime.now().strftime('%B %d, %Y')}</p>
+        <h2>$company</h2>
+        <p>Invoice #$invoice_number</p>
+        <p>Date: $date</p>
     </div>
     
     <div style="margin: 40px 0;">
         <strong>Bill To:</strong><br>
-        {to_persona['name']}<br>
-        {to_persona['position']}<br>
-        {to_persona['company']}<br>
-        {to_persona['email']}
+        $to_name<br>
+        $to_position<br>
+        $to_company<br>
+        $to_email
     </div>
 
     <table style="width: 100%; border-collapse: collapse;">
@@ -120,10 +154,10 @@ def create_invoice_html(from_persona, to_persona):
             <th style="padding: 10px; text-align: right;">Rate</th>
             <th style="padding: 10px; text-align: right;">Amount</th>
         </tr>
-        {items_html}
+        $items_html
         <tr>
             <td colspan="3" style="padding: 10px; text-align: right;"><strong>Total:</strong></td>
-            <td style="padding: 10px; text-align: right;"><strong>{format_currency(total)}</strong></td>
+            <td style="padding: 10px; text-align: right;"><strong>$total</strong></td>
         </tr>
     </table>
 
@@ -135,35 +169,108 @@ def create_invoice_html(from_persona, to_persona):
         Sort Code: 18-52-18</p>
     </div>
 </body>
-</html>"""
+</html>""")
+
+ROW_TMPL = """
+            <tr>
+                <td style="padding: 10px; border-top: 1px solid #ddd;">{description}</td>
+                <td style="padding: 10px; border-top: 1px solid #ddd; text-align: right;">{quantity}</td>
+                <td style="padding: 10px; border-top: 1px solid #ddd; text-align: right;">{rate}</td>
+                <td style="padding: 10px; border-top: 1px solid #ddd; text-align: right;">{amount}</td>
+            </tr>"""
+
+def format_currency(amount):
+    return f"£{amount:,.2f}"
+
+# Line items are fixed, so the rows and total are rendered once at import
+_INVOICE_ITEMS = (
+    {
+        'description': 'Analytical Engine Consultation',
+        'quantity': 5,
+        'rate': 150.0,
+        'amount': 750.0
+    },
+    {
+        'description': 'Algorithm Development',
+        'quantity': 3,
+        'rate': 200.0,
+        'amount': 600.0
+    },
+    {
+        'description': 'Punch Card Programming',
+        'quantity': 10,
+        'rate': 75.0,
+        'amount': 750.0
+    }
+)
+_INVOICE_TOTAL = format_currency(sum(item['amount'] for item in _INVOICE_ITEMS))
+_INVOICE_ROWS = "".join(
+    ROW_TMPL.format(
+        description=item['description'],
+        quantity=item['quantity'],
+        rate=format_currency(item['rate']),
+        amount=format_currency(item['amount'])
+    )
+    for item in _INVOICE_ITEMS
+)
+
+def create_invoice_html(from_persona, to_persona, now):
+    return INVOICE_TMPL.substitute(
+        company=from_persona['company'],
+        invoice_number=f"INV-{random.randint(1000, 9999)}",
+        date=now.strftime('%B %d, %Y'),
+        to_name=to_persona['name'],
+        to_position=to_persona['position'],
+        to_company=to_persona['company'],
+        to_email=to_persona['email'],
+        items_html=_INVOICE_ROWS,
+        total=_INVOICE_TOTAL
+    )
 
 def create_sample_image(width=100, height=100, color='blue'):
     """Create a simple colored rectangle as PNG"""
-    from PIL import Image, ImageDraw
     img = Image.new('RGB', (width, height), color='white')
     draw = ImageDraw.Draw(img)
     draw.rectangle([10, 10, width-10, height-10], fill=color)
     return img
 
-def get_company_logo(persona):
-    """Get the company logo for a persona"""
-    if persona['name'] == 'Ada Lovelace':
-        logo_path = 'doc/res/logos/aes_logo.svg'
-    elif persona['name'] == 'Alan Turing':
-        logo_path = 'doc/res/logos/bpr_logo.svg'
-    elif persona['name'] == 'Charles Babbage':
-        logo_path = 'doc/res/logos/dew_logo.svg'
-    elif persona['name'] == 'Grace Hopper':
-        logo_path = 'doc/res/logos/csi_logo.svg'
-    elif persona['name'] == 'Linus Torvalds':
-        logo_path = 'doc/res/logos/linux_logo.svg'
-    elif persona['name'] == 'Tim Berners-Lee':
-        logo_path = 'doc/res/logos/w3c_logo.svg'
-    elif persona['name'] == 'Margaret Hamilton':
-        logo_path = 'doc/res/logos/nasa_logo.svg'
-    else:
+@lru_cache(maxsize=None)
+def _png_data_uri(width, height, color):
+    """Render the sample image once and return it as a base64 PNG data URI"""
+    img = create_sample_image(width, height, color)
+    buffered = BytesIO()
+    img.save(buffered, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffered.getvalue()).decode()
+
+LOGO_PATHS = {
+    'Ada Lovelace': 'doc/res/logos/aes_logo.svg',
+    'Alan Turing': 'doc/res/logos/bpr_logo.svg',
+    'Charles Babbage': 'doc/res/logos/dew_logo.svg',
+    'Grace Hopper': 'doc/res/logos/csi_logo.svg',
+    'Linus Torvalds': 'doc/res/logos/linux_logo.svg',
+    'Tim Berners-Lee': 'doc/res/logos/w3c_logo.svg',
+    'Margaret Hamilton': 'doc/res/logos/nasa_logo.svg',
+}
+
+# Persona -> (Content-ID, Content-Disposition) of its inline logo part,
+# formatted once so the email package doesn't re-encode the filename parameter
+_LOGO_HEADERS = {
+    'Ada Lovelace': ('<aes-logo>', 'inline; filename="aes_logo.svg"'),
+    'Alan Turing': ('<bpr-logo>', 'inline; filename="bpr_logo.svg"'),
+    'Charles Babbage': ('<dew-logo>', 'inline; filename="dew_logo.svg"'),
+    'Grace Hopper': ('<csi-logo>', 'inline; filename="csi_logo.svg"'),
+    'Linus Torvalds': ('<linux-logo>', 'inline; filename="linux_logo.svg"'),
+    'Tim Berners-Lee': ('<w3c-logo>', 'inline; filename="w3c_logo.svg"'),
+    'Margaret Hamilton': ('<nasa-logo>', 'inline; filename="nasa_logo.svg"'),
+}
+
+@lru_cache(maxsize=None)
+def _load_logo(name):
+    """Read a persona's logo once per run"""
+    logo_path = LOGO_PATHS.get(name)
+    if logo_path is None:
         return None
-        
+
     try:
         with open(logo_path, 'rb') as f:
             return f.read()
@@ -171,26 +278,89 @@ def get_company_logo(persona):
         print(f"Error loading logo: {e}")
         return None
 
-def create_sample_pdf(title="Meeting Minutes"):
-    """Create a simple PDF file"""
-    from reportlab.pdfgen import canvas
-    from io import BytesIO
+def create_sample_pdf(title="Meeting Minutes", generated=None):
+    """Create a simple PDF file, dated today unless generated is given"""
+    if generated is None:
+        generated = datetime.now().strftime("%Y-%m-%d")
+    return _render_pdf(title, generated)
+
+@lru_cache(maxsize=None)
+def _render_pdf(title, generated):
+    """Render a sample PDF once per title and generation date"""
     buffer = BytesIO()
     c = canvas.Canvas(buffer)
     c.drawString(100, 750, title)
-    c.drawString(100, 730, "Generated: " + datetime.now().strftime("%Y-%m-%d"))
+    c.drawString(100, 730, "Generated: " + generated)
     c.save()
     return buffer.getvalue()
 
+@lru_cache(maxsize=None)
+def _logo_base64(name):
+    """Base64-encode a persona's logo once per run"""
+    logo_data = _load_logo(name)
+    if logo_data is None:
+        return None
+    return base64.encodebytes(logo_data).decode('ascii')
+
+@lru_cache(maxsize=None)
+def _pdf_base64(title, generated):
+    """Base64-encode a sample PDF once per title and date"""
+    return base64.encodebytes(_render_pdf(title, generated)).decode('ascii')
+
+def _build_logo_part(persona):
+    """Build a persona's inline SVG logo part from the cached base64 payload"""
+    logo_b64 = _logo_base64(persona['name'])
+    if logo_b64 is None:
+        return None
+    content_id, disposition = _LOGO_HEADERS[persona['name']]
+    img = MIMENonMultipart('image', 'svg+xml')
+    img.set_payload(logo_b64)
+    img['Content-Transfer-Encoding'] = 'base64'
+    img['Content-ID'] = content_id
+    img['Content-Disposition'] = disposition
+    return img
+
+def _encode_html(html):
+    """Pick the charset and transfer encoding MIMEText would use for an HTML body"""
+    if html.isascii():
+        return 'us-ascii', '7bit', html
+    return 'utf-8', 'base64', base64.encodebytes(html.encode('utf-8')).decode('ascii')
+
+def _html_part(html):
+    """Build a text/html part using the shared charset objects"""
+    return MIMEText(html, 'html', _ASCII if html.isascii() else _UTF8)
+
+def write_eml(filename, msg):
+    """Write a message, or already serialized EML bytes, to OUTPUT_DIR"""
+    if isinstance(msg, bytes):
+        data = msg
+    else:
+        buffer = BytesIO()
+        BytesGenerator(buffer, mangle_from_=False, maxheaderlen=0).flatten(msg)
+        data = buffer.getvalue()
+    fd = os.open(OUTPUT_DIR + filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # os.write may write less than asked; keep going until it's all out
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    return filename
+
 def generate_mock_emails():
+    # One clock read for the whole run; every Date header is relative to it
+    now = datetime.now()
+    today = now.strftime("%Y-%m-%d")
+
     # Helper to generate basic parts
     def create_base_msg(sender, recipient, subject, date_offset=0):
         msg = MIMEMultipart()
         msg['Subject'] = subject
-        msg['From'] = f"{sender['name']} <{sender['email']}>"
-        msg['To'] = f"{recipient['name']} <{recipient['email']}>"
-        msg['Date'] = (datetime.now() - timedelta(days=date_offset)).strftime('%a, %d %b %Y %H:%M:%S +0000')
-        msg['Message-ID'] = f"<{random.randint(1000000,9999999)}@{sender['email'].split('@')[1]}>"
+        msg['From'] = sender['header']
+        msg['To'] = recipient['header']
+        msg['Date'] = (now - timedelta(days=date_offset)).strftime(_RFC2822_FMT)
+        msg['Message-ID'] = f"<{random.getrandbits(23) + 1000000}@{sender['domain']}>"
         return msg
 
     emails_to_generate = []
@@ -206,10 +376,10 @@ def generate_mock_emails():
     def scenario_a():
         msg = MIMEMultipart('related')
         msg['Subject'] = 'First Draft: HyperText Project'
-        msg['From'] = f"{PERSONAS[5]['name']} <{PERSONAS[5]['email']}>" # Tim
-        msg['To'] = f"{PERSONAS[4]['name']} <{PERSONAS[4]['email']}>"   # Linus
-        msg['Date'] = (datetime.now() - timedelta(hours=2)).strftime('%a, %d %b %Y %H:%M:%S +0000')
-        msg['Message-ID'] = f"<related-{random.randint(1000,9999)}@w3c.org>"
+        msg['From'] = PERSONAS[5]['header'] # Tim
+        msg['To'] = PERSONAS[4]['header']   # Linus
+        msg['Date'] = (now - timedelta(hours=2)).strftime(_RFC2822_FMT)
+        msg['Message-ID'] = f"<related-{random.getrandbits(13) + 1000}@w3c.org>"
 
         html = f"""<html><body>
             <p>Linus,</p>
@@ -222,14 +392,11 @@ def generate_mock_emails():
         
         msg_alt = MIMEMultipart('alternative')
         msg.attach(msg_alt)
-        msg_alt.attach(MIMEText(html, 'html'))
+        msg_alt.attach(_html_part(html))
 
         # Attach Inline Image
-        logo_data = get_company_logo(PERSONAS[5]) # Tim
-        if logo_data:
-            img = MIMEImage(logo_data, _subtype='svg+xml')
-            img.add_header('Content-ID', '<w3c-logo>')
-            img.add_header('Content-Disposition', 'inline', filename='w3c_logo.svg')
+        img = _build_logo_part(PERSONAS[5]) # Tim
+        if img:
             msg.attach(img)
         
         return 'mock_email_scenario_a_related.eml', msg
@@ -247,11 +414,8 @@ def generate_mock_emails():
         msg.attach(MIMEText(body, 'plain'))
 
         # Add Logo
-        logo_data = get_company_logo(sender)
-        if logo_data:
-            img = MIMEImage(logo_data, _subtype='svg+xml')
-            img.add_header('Content-ID', '<linux-logo>')
-            img.add_header('Content-Disposition', 'inline', filename='linux_logo.svg')
+        img = _build_logo_part(sender)
+        if img:
             msg.attach(img)
 
         # Attachment with whitespace
@@ -272,16 +436,13 @@ def generate_mock_emails():
         recipient = PERSONAS[0] # Ada
         msg = create_base_msg(sender, recipient, "LGC Program 1202 Alarm Analysis")
 
-        # Create a tiny PNG for the Base64 URI (red dot)
-        img = create_sample_image(20, 20, 'red')
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
+        # Tiny PNG for the Base64 URI (red dot)
+        img_uri = _png_data_uri(20, 20, 'red')
 
         html = f"""<html><body>
             <p>Ada,</p>
             <p>We are seeing some 1202 alarms during simulation.</p>
-            <p>Status Indicator: <img src="data:image/png;base64,{img_str}" /> (Red means overload)</p>
+            <p>Status Indicator: <img src="{img_uri}" /> (Red means overload)</p>
             <p>I believe it's the rendezvous radar switch position.</p>
             <pre>
             TC      INTRP
@@ -291,14 +452,11 @@ def generate_mock_emails():
             <br>
             <img src="cid:nasa-logo" width="300">
         </body></html>"""
-        msg.attach(MIMEText(html, 'html'))
+        msg.attach(_html_part(html))
 
         # Add Logo
-        logo_data = get_company_logo(sender)
-        if logo_data:
-            img = MIMEImage(logo_data, _subtype='svg+xml')
-            img.add_header('Content-ID', '<nasa-logo>')
-            img.add_header('Content-Disposition', 'inline', filename='nasa_logo.svg')
+        img = _build_logo_part(sender)
+        if img:
             msg.attach(img)
 
         return 'mock_email_scenario_c_base64.eml', msg
@@ -322,18 +480,15 @@ def generate_mock_emails():
         m3 = MIMEMultipart()
         sender = PERSONAS[1] # Charles
         m3['Subject'] = "Fwd: Fwd: The original joke"
-        m3['From'] = f"{sender['name']} <{sender['email']}>"
-        m3['To'] = f"{PERSONAS[2]['name']} <{PERSONAS[2]['email']}>"
-        m3['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')
+        m3['From'] = sender['header']
+        m3['To'] = PERSONAS[2]['header']
+        m3['Date'] = now.strftime(_RFC2822_FMT)
         m3.attach(MIMEText("Have you seen this?\n\n", 'plain'))
         m3.attach(MIMEMessage(m2))
 
         # Add Logo to the top level message (m3)
-        logo_data = get_company_logo(sender)
-        if logo_data:
-            img = MIMEImage(logo_data, _subtype='svg+xml')
-            img.add_header('Content-ID', '<dew-logo>')
-            img.add_header('Content-Disposition', 'inline', filename='dew_logo.svg')
+        img = _build_logo_part(sender)
+        if img:
             m3.attach(img)
 
         return 'mock_email_scenario_d_nested.eml', m3
@@ -347,9 +502,9 @@ def generate_mock_emails():
         recipient = PERSONAS[3] # Grace
         msg = MIMEMultipart('mixed')
         msg['Subject'] = "Flight Plan & Signature Test"
-        msg['From'] = f"{sender['name']} <{sender['email']}>"
-        msg['To'] = f"{recipient['name']} <{recipient['email']}>"
-        msg['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')
+        msg['From'] = sender['header']
+        msg['To'] = recipient['header']
+        msg['Date'] = now.strftime(_RFC2822_FMT)
 
         # Related part for body + inline signature
         msg_related = MIMEMultipart('related')
@@ -362,18 +517,15 @@ def generate_mock_emails():
             <img src="cid:nasa-logo" width="150"><br>
             Margaret
         </body></html>"""
-        msg_related.attach(MIMEText(html, 'html'))
+        msg_related.attach(_html_part(html))
 
         # Inline Logo (CID)
-        logo_data = get_company_logo(sender)
-        if logo_data:
-            img = MIMEImage(logo_data, _subtype='svg+xml')
-            img.add_header('Content-ID', '<nasa-logo>')
-            img.add_header('Content-Disposition', 'inline', filename='nasa_logo.svg')
+        img = _build_logo_part(sender)
+        if img:
             msg_related.attach(img)
 
         # Regular Attachment
-        pdf_data = create_sample_pdf("Flight Plan Delta")
+        pdf_data = create_sample_pdf("Flight Plan Delta", today)
         pdf_att = MIMEApplication(pdf_data, _subtype='pdf')
         pdf_att.add_header('Content-Disposition', 'attachment', filename='flight_plan.pdf')
         msg.attach(pdf_att)
@@ -400,59 +552,50 @@ def generate_mock_emails():
         (PERSONAS[1], PERSONAS[0], 'Minutes from yesterday\'s Engine Design Review', 'minutes', False, 'mock_email_4.eml')
     ]
 
+    # These emails have a fixed layout, so their EML text is emitted directly
     for i, (p_from, p_to, subj, type, needs_att, filename) in enumerate(original_scenarios):
-        msg = MIMEMultipart()
-        msg['Subject'] = subj
-        msg['From'] = f"{p_from['name']} <{p_from['email']}>"
-        msg['To'] = f"{p_to['name']} <{p_to['email']}>"
-        msg['Date'] = (datetime.now() - timedelta(days=i)).strftime('%a, %d %b %Y %H:%M:%S +0000')
-        msg['Message-ID'] = f"<{random.randint(1000000,9999999)}@{p_from['email'].split('@')[1]}>"
+        boundary = f"===============mock_email_{i + 1}=="
 
-        logo_data = get_company_logo(p_from)
-        
         # HTML Content
+        header, intro, pdf_title = SCENARIO_META[type]
         if type == 'invoice':
-            html = create_invoice_html(p_from, p_to)
-            pdf_title = "Invoice Details"
-        elif type == 'update':
-            html = f"""<!DOCTYPE html><html><body style="font-family: Arial; padding: 20px;">
-                <p>Dear {p_to['name']},</p><p>Significant progress on universal computing.</p>
-                <img src="cid:company-logo" style="max-width: 200px;"></body></html>"""
-            pdf_title = "Project Specifications"
-        elif type == 'bug_report':
-            html = f"""<!DOCTYPE html><html><body style="font-family: Arial; padding: 20px;">
-                <p>Dear {p_to['name']},</p><p>Found a bug in the compiler.</p>
-                <img src="cid:company-logo" style="max-width: 200px;"></body></html>"""
-            pdf_title = "Debug Logs"
-        else: # minutes
-            html = f"""<!DOCTYPE html><html><body style="font-family: Arial; padding: 20px;">
-                <h2>Meeting Summary</h2><p>Dear {p_to['name']},</p>
-                <img src="cid:company-logo" style="max-width: 200px;"></body></html>"""
-            pdf_title = "Meeting Minutes"
-
-        msg.attach(MIMEText(html, 'html'))
-
-        if logo_data:
-            logo_mime = MIMEImage(logo_data, _subtype='svg+xml')
-            logo_mime.add_header('Content-ID', '<company-logo>')
-            logo_mime.add_header('Content-Disposition', 'inline', filename='company_logo.svg')
-            msg.attach(logo_mime)
+            html = create_invoice_html(p_from, p_to, now)
+        else:
+            html = BASIC_TMPL.substitute(header=header, to_name=p_to['name'], intro=intro)
+        charset, encoding, html = _encode_html(html)
+
+        parts = []
+        logo_b64 = _logo_base64(p_from['name'])
+        if logo_b64:
+            parts.append(LOGO_PART_TMPL.substitute(boundary=boundary, payload=logo_b64))
 
         if needs_att:
-            pdf_data = create_sample_pdf(pdf_title)
-            pdf_mime = MIMEApplication(pdf_data, _subtype='pdf')
-            pdf_mime.add_header('Content-Disposition', 'attachment', filename=f"{pdf_title.lower().replace(' ', '_')}.pdf")
-            msg.attach(pdf_mime)
-            
-        emails_to_generate.append((filename, msg))
-
-    # Write all files
-    for filename, msg in emails_to_generate:
-        with open(f'doc/eml/{filename}', 'w') as f:
-            f.write(msg.as_string())
-        print(f"Generated {filename}")
+            parts.append(PDF_PART_TMPL.substitute(
+                boundary=boundary,
+                filename=f"{pdf_title.lower().replace(' ', '_')}.pdf",
+                payload=_pdf_base64(pdf_title, today)
+            ))
+
+        eml = BASIC_EML_TMPL.substitute(
+            boundary=boundary,
+            subject=subj,
+            sender=p_from['header'],
+            recipient=p_to['header'],
+            date=(now - timedelta(days=i)).strftime(_RFC2822_FMT),
+            message_id=f"<{random.getrandbits(23) + 1000000}@{p_from['domain']}>",
+            charset=charset,
+            encoding=encoding,
+            html=html,
+            parts=''.join(parts)
+        )
+        emails_to_generate.append((filename, eml.encode('ascii')))
+
+    # Write all files, overlapping each write with serializing the others
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for filename in executor.map(write_eml, *zip(*emails_to_generate)):
+            print(f"Generated {filename}")
 def main():
-    os.makedirs('doc/eml', exist_ok=True)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     generate_mock_emails()
 
 if __name__ == '__main__':